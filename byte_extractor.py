@@ -1,3 +1,5 @@
+from mmap import mmap, ACCESS_READ
+import os
 import sys
 
 read_filename = sys.argv[1] #'5a82f017.pc'
@@ -5,9 +7,14 @@ write_filename = sys.argv[2] #'sample_leaf.leaf'
 start_byte = int(sys.argv[3], 0) #0x00034d36
 end_byte = int(sys.argv[4], 0) #0x00036833
 
-with open(read_filename, 'rb') as read_file:
-	read_file.seek(start_byte)
-	data = read_file.read(end_byte - start_byte)
-
-with open(write_filename, 'w+b') as write_file:
-	write_file.write(data)
\ No newline at end of file
+with open(read_filename, 'rb') as read_file, open(write_filename, 'w+b') as write_file:
+	offset = start_byte
+	try:
+		while offset < end_byte:
+			sent = os.sendfile(write_file.fileno(), read_file.fileno(), offset, end_byte - offset)
+			if sent == 0:
+				break
+			offset += sent
+	except (AttributeError, OSError): # No sendfile on Windows, or not supported for these files
+		with mmap(read_file.fileno(), 0, access=ACCESS_READ) as read_map, memoryview(read_map) as read_view:
+			write_file.write(read_view[offset:end_byte])
\ No newline at end of file
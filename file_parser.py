@@ -1,177 +1,239 @@
-from io import BufferedReader
+from struct import Struct
 from typing import Any, Callable
-import struct
 import sys
 
 DataObject = dict[str, Any]
 DataList = list[DataObject]
 
-def read_int(file: BufferedReader) -> int:
-	return struct.unpack('<i', file.read(4))[0]
-
-def read_short(file: BufferedReader) -> int:
-	return struct.unpack('<h', file.read(4))[0]
-
-def read_float(file: BufferedReader) -> float:
-	return struct.unpack('<f', file.read(4))[0]
-
-def read_bool(file: BufferedReader) -> bool:
-	return struct.unpack('<?', file.read(1))[0]
-
-def read_string(file: BufferedReader) -> str:
-	size = read_int(file)
-	return file.read(size).decode()
-
-def read_hash(file: BufferedReader) -> str:
-	hash_big_endian = file.read(4)
-	hash_little_endian = bytes(reversed(hash_big_endian))
-	return hash_little_endian.hex()
-
-def read_vector(file: BufferedReader) -> tuple[float, float, float]:
-	x = read_float(file)
-	y = read_float(file)
-	z = read_float(file)
-	return (x, y, z)
-
-def read_color(file: BufferedReader) -> tuple[float, float, float, float]:
-	r = read_float(file)
-	g = read_float(file)
-	b = read_float(file)
-	a = read_float(file)
-	return (r, g, b, a)
-
-def read_transform(file: BufferedReader) -> dict[str, tuple[float, float, float]]:
-	position = read_vector(file)
-	rotation_x = read_vector(file)
-	rotation_y = read_vector(file)
-	rotation_z = read_vector(file)
-	scale = read_vector(file)
-	return {
-		'pos': position,
-		'rot_x': rotation_x,
-		'rot_y': rotation_y,
-		'rot_z': rotation_z,
-		'scale': scale,
-	}
-
-def read_file_path(file: BufferedReader) -> str | tuple[int, str]:
-	root_index = read_int(file)
-	file_path = read_string(file)
+int_struct = Struct('<i')
+short_struct = Struct('<h')
+float_struct = Struct('<f')
+hash_struct = Struct('<I')
+sub_level_struct = Struct('<Ii')
+vector_struct = Struct('<3f')
+transform_struct = Struct('<15f')
+
+class Cursor:
+	"""A read position into a file's bytes, shared by all of the readers below"""
+	__slots__ = ('mv', 'off')
+
+	def __init__(self, mv: memoryview, off: int = 0):
+		self.mv = mv
+		self.off = off
+
+def read_int(cursor: Cursor) -> int:
+	value, = int_struct.unpack_from(cursor.mv, cursor.off)
+	cursor.off += 4
+	return value
+
+def read_short(cursor: Cursor) -> int:
+	value, = short_struct.unpack_from(cursor.mv, cursor.off)
+	cursor.off += 2
+	return value
+
+def read_float(cursor: Cursor) -> float:
+	value, = float_struct.unpack_from(cursor.mv, cursor.off)
+	cursor.off += 4
+	return value
+
+def read_bool(cursor: Cursor) -> bool:
+	value = cursor.mv[cursor.off]
+	cursor.off += 1
+	return value != 0
+
+def skip(cursor: Cursor, size: int):
+	cursor.off += size
+
+def skip_string(cursor: Cursor):
+	size, = int_struct.unpack_from(cursor.mv, cursor.off)
+	cursor.off += 4 + size
+
+decoded_strings: dict[bytes, str] = {}
+def read_string(cursor: Cursor) -> str:
+	size = read_int(cursor)
+	start = cursor.off
+	cursor.off += size
+	encoded_string = bytes(cursor.mv[start:cursor.off])
+	string = decoded_strings.get(encoded_string)
+	if string is None:
+		string = decoded_strings[encoded_string] = sys.intern(encoded_string.decode())
+	return string
+
+def read_hash_value(cursor: Cursor) -> int:
+	value, = hash_struct.unpack_from(cursor.mv, cursor.off) # Stored little-endian, displayed big-endian
+	cursor.off += 4
+	return value
+
+hash_strings: dict[int, str] = {}
+def format_hash(value: int) -> str:
+	hash_string = hash_strings.get(value)
+	if hash_string is None:
+		hash_string = hash_strings[value] = f'{value:08x}'
+	return hash_string
+
+def read_vector(cursor: Cursor) -> tuple[float, float, float]:
+	vector = vector_struct.unpack_from(cursor.mv, cursor.off)
+	cursor.off += 12
+	return vector
+
+def read_transform(cursor: Cursor) -> tuple[float, ...]:
+	"""Position, x rotation, y rotation, z rotation and scale vectors as one flat tuple of 15 floats"""
+	transform = transform_struct.unpack_from(cursor.mv, cursor.off)
+	cursor.off += 60
+	return transform
+
+def read_file_path(cursor: Cursor) -> str | tuple[int, str]:
+	root_index = read_int(cursor)
+	file_path = read_string(cursor)
 	return file_path if root_index == 0 else (root_index, file_path)
 
-def read_animation_component(file: BufferedReader) -> DataObject:
+def skip_file_path(cursor: Cursor):
+	skip(cursor, 4) # root_index
+	skip_string(cursor) # file_path
+
+def read_animation_component(cursor: Cursor) -> DataObject:
 	"""https://rainbowunicorn7297.github.io/#.leaf%20Objects"""
-	animation_component_version_number = read_int(file)
-	frame = read_float(file)
-	unit_of_time = read_string(file)
+	skip(cursor, 8) # animation_component_version_number, frame
+	skip_string(cursor) # unit_of_time
 	return {}
 
-def read_edit_state_component(file: BufferedReader) -> DataObject:
+def read_edit_state_component(cursor: Cursor) -> DataObject:
 	"""https://rainbowunicorn7297.github.io/#.leaf%20Objects"""
 	return {}
 
-def read_approach_animation_component(file: BufferedReader) -> DataObject:
-	animation_component_version_number = read_int(file)
-	frame = read_float(file)
-	unit_of_time = read_string(file)
-	approach_animation_component_version_number = read_int(file)
-	num_approach_beats = read_int(file)
+def read_approach_animation_component(cursor: Cursor) -> DataObject:
+	skip(cursor, 8) # animation_component_version_number, frame
+	skip_string(cursor) # unit_of_time
+	skip(cursor, 4) # approach_animation_component_version_number
+	num_approach_beats = read_int(cursor)
 	return {
 		'approach_beats': num_approach_beats
 	}
 
-def read_transform_component(file: BufferedReader) -> DataObject:
+def read_transform_component(cursor: Cursor) -> DataObject:
 	"""https://rainbowunicorn7297.github.io/#.spn%20Objects"""
-	transform_component_version_number = read_int(file)
-	transform_parent_object_name = read_string(file)
-	transform_constraint = read_string(file)
-	transform = read_transform(file)
+	skip(cursor, 4) # transform_component_version_number
+	transform_parent_object_name = read_string(cursor)
+	transform_constraint = read_string(cursor)
+	transform = read_transform(cursor)
 	return {
 		'xfm_name': transform_parent_object_name,
 		'constrainnt': transform_constraint,
-		**transform,
+		'pos': transform[0:3],
+		'rot_x': transform[3:6],
+		'rot_y': transform[6:9],
+		'rot_z': transform[9:12],
+		'scale': transform[12:15],
 	}
 
-def read_draw_component(file: BufferedReader) -> DataObject:
+def read_draw_component(cursor: Cursor) -> DataObject:
 	"""https://rainbowunicorn7297.github.io/#.mesh%20Objects"""
-	draw_component_version_number = read_int(file)
-	is_visible = read_bool(file)
-	draw_layer = read_string(file)
-	render_bucket = read_string(file)
-	num_draw_children = read_int(file)
+	skip(cursor, 5) # draw_component_version_number, is_visible
+	skip_string(cursor) # draw_layer
+	skip_string(cursor) # render_bucket
+	num_draw_children = read_int(cursor)
 	for _ in range(num_draw_children):
-		draw_child_name = read_string(file)
+		skip_string(cursor) # draw_child_name
 
 component_readers = {
-	'63259f0a': read_animation_component,
-	'3c8efb12': read_edit_state_component,
-	'6c2d3373': read_approach_animation_component,
-	'84e761eb': read_transform_component,
-	'f92719ee': read_draw_component,
+	0x63259f0a: read_animation_component,
+	0x3c8efb12: read_edit_state_component,
+	0x6c2d3373: read_approach_animation_component,
+	0x84e761eb: read_transform_component,
+	0xf92719ee: read_draw_component,
 }
-def read_component(file: BufferedReader) -> DataObject:
-	component_marker = read_hash(file)
-	component_reader = component_readers[component_marker]
-	return component_reader(file)
-
-def read_components(file: BufferedReader) -> DataList:
-	num_components = read_int(file)
+def read_components(cursor: Cursor) -> DataList:
+	num_components = read_int(cursor)
 	components: DataList = []
+	mv = cursor.mv
+	unpack_hash = hash_struct.unpack_from
 	for _ in range(num_components):
-		component = read_component(file)
-		components.append(component)
+		component_marker, = unpack_hash(mv, cursor.off)
+		cursor.off += 4
+		components.append(component_readers[component_marker](cursor))
 	return components
 
-def read_trait_path(file: BufferedReader) -> list[str | tuple[str, int]]:
+def read_trait_path(cursor: Cursor) -> list[str | tuple[str, int]]:
 	"""https://rainbowunicorn7297.github.io/#TraitPath"""
-	num_sub_levels = read_int(file)
+	num_sub_levels = read_int(cursor)
 	sub_levels: list[str | tuple[str, int]] = []
+	mv = cursor.mv
+	off = cursor.off
+	unpack_sub_level = sub_level_struct.unpack_from
 	for _ in range(num_sub_levels):
-		member = read_hash(file)
-		member_index = read_int(file)
+		member_value, member_index = unpack_sub_level(mv, off)
+		off += 8
+		member = format_hash(member_value)
 		sub_levels.append(member if member_index == -1 else (member, member_index))
+	cursor.off = off
 	return sub_levels
 
-data_point_readers = [
-	read_int,
-	read_bool,
-	read_float,
-	read_color,
-	None,
-	None,
-	None,
-	None,
-	read_bool,
-	None,
-	None,
-	None,
-	None,
-	None,
-	None,
-	None,
-	None,
-	None,
-	None,
-	None,
-]
-def read_data_point(file: BufferedReader, trait_type: int) -> tuple[float, Any]:
+def skip_trait_path(cursor: Cursor):
+	num_sub_levels = read_int(cursor)
+	skip(cursor, 8 * num_sub_levels) # member, member_index
+
+class DataPoints:
+	"""Data point times and values as parallel lists, only paired up when formatted"""
+	__slots__ = ('times', 'values')
+
+	def __init__(self, times: list[float], values: list[Any]):
+		self.times = times
+		self.values = values
+
+data_point_structs = { # Time followed by the value
+	0: Struct('<fi'),	# kTraitInt
+	1: Struct('<f?'),	# kTraitBool
+	2: Struct('<ff'),	# kTraitFloat
+	3: Struct('<f4f'),	# kTraitColor
+	8: Struct('<f?'),	# kTraitAction
+}
+def read_data_points(cursor: Cursor, trait_type: int) -> DataPoints:
 	"""https://rainbowunicorn7297.github.io/#Data%20Point%20Types"""
-	data_point_reader = data_point_readers[trait_type]
-	if data_point_reader is None:
+	num_data_points = read_int(cursor)
+	times: list[float] = []
+	values: list[Any] = []
+	if num_data_points == 0:
+		return DataPoints(times, values)
+	data_point_struct = data_point_structs.get(trait_type)
+	if data_point_struct is None:
 		raise TypeError(f'No data point reader for trait type {trait_type}')
-	time = read_float(file)
-	data_point = data_point_reader(file)
-	interpolation_method = read_string(file)
-	easing_method = read_string(file)
-	return (time, data_point)
-
-def read_data_points(file: BufferedReader, trait_type: int):
-	num_data_points = read_int(file)
-	data_points: dict[float, float | tuple[float, float, float, float]] = {}
+	mv = cursor.mv
+	off = cursor.off
+	unpack_data_point = data_point_struct.unpack_from
+	data_point_size = data_point_struct.size
+	unpack_int = int_struct.unpack_from
+	append_time = times.append
+	append_value = values.append
 	for _ in range(num_data_points):
-		data_point = read_data_point(file, trait_type)
-		data_points[data_point[0]] = data_point[1]
-	return data_points
+		data_point = unpack_data_point(mv, off)
+		off += data_point_size
+		interpolation_method_size, = unpack_int(mv, off)
+		off += 4 + interpolation_method_size
+		easing_method_size, = unpack_int(mv, off)
+		off += 4 + easing_method_size
+		append_time(data_point[0])
+		append_value(data_point[1] if len(data_point) == 2 else data_point[1:])
+	cursor.off = off
+	return DataPoints(times, values)
+
+def skip_data_points(cursor: Cursor, trait_type: int):
+	num_data_points = read_int(cursor)
+	if num_data_points == 0:
+		return
+	data_point_struct = data_point_structs.get(trait_type)
+	if data_point_struct is None:
+		raise TypeError(f'No data point reader for trait type {trait_type}')
+	mv = cursor.mv
+	off = cursor.off
+	data_point_size = data_point_struct.size
+	unpack_int = int_struct.unpack_from
+	for _ in range(num_data_points):
+		off += data_point_size
+		interpolation_method_size, = unpack_int(mv, off)
+		off += 4 + interpolation_method_size
+		easing_method_size, = unpack_int(mv, off)
+		off += 4 + easing_method_size
+	cursor.off = off
 
 trait_type_names = [
 	'kTraitInt',
@@ -195,28 +257,21 @@ trait_type_names = [
 	'kTraitComponent',
 	'kNumTraitTypes',
 ]
-def read_sequencer_object(file: BufferedReader) -> DataObject:
+sequencer_object_settings_struct = Struct('<5i')
+sequencer_object_flags_struct = Struct('<2?if4f2?x')
+def read_sequencer_object(cursor: Cursor) -> DataObject:
 	"""https://rainbowunicorn7297.github.io/#.leaf%20Objects and https://rainbowunicorn7297.github.io/#Sequencer%20Objects"""
-	object_name = read_string(file)
-	trait_path = read_trait_path(file)
-	trait_type = read_int(file)
-	data_points = read_data_points(file, trait_type)
-	ui_elements = read_data_points(file, trait_type)
-	line_animation_type = read_int(file)
-	default_trait_interpolation_method = read_int(file)
-	default_trait_easing_method = read_int(file)
-	unused_1 = read_int(file)
-	unused_2 = read_int(file)
-	intensity_operation_1 = read_string(file)
-	intensity_operation_2 = read_string(file)
-	has_intensity_phase = read_bool(file)
-	trait_setter_op = read_bool(file)
-	step_frequency = read_int(file)
-	unused_3 = read_float(file)
-	unused_4 = read_color(file)
-	intensity_scale = read_bool(file)
-	unused_5 = read_bool(file)
-	unknown = read_bool(file)
+	object_name = read_string(cursor)
+	trait_path = read_trait_path(cursor)
+	trait_type = read_int(cursor)
+	data_points = read_data_points(cursor, trait_type)
+	skip_data_points(cursor, trait_type) # ui_elements
+	line_animation_type, default_trait_interpolation_method, default_trait_easing_method, unused_1, unused_2 = sequencer_object_settings_struct.unpack_from(cursor.mv, cursor.off)
+	cursor.off += sequencer_object_settings_struct.size
+	intensity_operation_1 = read_string(cursor)
+	intensity_operation_2 = read_string(cursor)
+	has_intensity_phase, trait_setter_op, step_frequency, unused_3, *unused_4, intensity_scale, unused_5 = sequencer_object_flags_struct.unpack_from(cursor.mv, cursor.off) # unused_4 is a color, followed by an unknown byte
+	cursor.off += sequencer_object_flags_struct.size
 	return {
 		'obj_name': object_name,
 		'param_path': trait_path[0],
@@ -241,28 +296,20 @@ def read_sequencer_object(file: BufferedReader) -> DataObject:
 		]
 	}
 
-def read_sequencer_objects(file: BufferedReader) -> DataList:
+def read_sequencer_objects(cursor: Cursor) -> DataList:
 	"""https://rainbowunicorn7297.github.io/#.leaf%20Objects"""
-	num_sequencer_objects = read_int(file)
-	sequencer_objects: DataList = []
-	for _ in range(num_sequencer_objects):
-		sequencer_object_component = read_sequencer_object(file)
-		sequencer_objects.append(sequencer_object_component)
-	return sequencer_objects
-
-def read_leaf(file: BufferedReader, name: str) -> DataObject:
+	num_sequencer_objects = read_int(cursor)
+	return [read_sequencer_object(cursor) for _ in range(num_sequencer_objects)]
+
+def read_leaf(cursor: Cursor, name: str) -> DataObject:
 	"""https://rainbowunicorn7297.github.io/#.leaf%20Objects"""
-	sequin_leaf_version_number = read_int(file)
-	trait_anim_version_number = read_int(file)
-	obj_version_number = read_int(file)
-	components = read_components(file)
-	sequencer_objects = read_sequencer_objects(file)
-	num_beats = read_int(file)
-	path_phase = read_float(file)
-	tile_phase = read_float(file)
-	for _ in range(num_beats):
-		unused = read_vector(file)
-	turn_lane_offset = read_int(file)
+	skip(cursor, 12) # sequin_leaf_version_number, trait_anim_version_number, obj_version_number
+	components = read_components(cursor)
+	sequencer_objects = read_sequencer_objects(cursor)
+	num_beats = read_int(cursor)
+	skip(cursor, 8) # path_phase, tile_phase
+	skip(cursor, 12 * num_beats) # unused vector for each beat
+	skip(cursor, 4) # turn_lane_offset
 	return {
 		'obj_type': 'SequinLeaf',
 		'obj_name': name,
@@ -270,44 +317,44 @@ def read_leaf(file: BufferedReader, name: str) -> DataObject:
 		'beat_cnt': num_beats,
 	}
 
-def read_global_library(file: BufferedReader) -> DataObject:
-	unknown = read_int(file)
-	library_name = read_string(file)
+def read_global_library(cursor: Cursor) -> DataObject:
+	skip(cursor, 4) # unknown
+	skip_string(cursor) # library_name
 	return {}
 
-def read_global_libraries(file: BufferedReader) -> DataList:
-	num_global_libraries = read_int(file)
+def read_global_libraries(cursor: Cursor) -> DataList:
+	num_global_libraries = read_int(cursor)
 	global_libraries: DataList = []
 	for _ in range(num_global_libraries):
-		global_library = read_global_library(file)
+		global_library = read_global_library(cursor)
 		global_libraries.append(global_library)
 	return global_libraries
 
-def read_level_external_object(file: BufferedReader) -> DataObject:
-	object_type = read_hash(file)
-	object_name = read_string(file)
-	unknown = read_int(file)
+def read_level_external_object(cursor: Cursor) -> DataObject:
+	skip(cursor, 4) # object_type
+	skip_string(cursor) # object_name
+	skip(cursor, 4) # unknown
 	return {}
 
-def read_level_external_objects(file: BufferedReader) -> DataList:
-	num_external_objects = read_int(file)
+def read_level_external_objects(cursor: Cursor) -> DataList:
+	num_external_objects = read_int(cursor)
 	external_objects: DataList = []
 	for _ in range(num_external_objects):
-		external_object = read_level_external_object(file)
+		external_object = read_level_external_object(cursor)
 		external_objects.append(external_object)
 	return external_objects
 
-def read_lvl_grouping(file: BufferedReader) -> DataObject:
-	lvl_object_name = read_string(file)
-	gate_object_name = read_string(file)
-	has_checkpoint = read_bool(file)
-	checkpoint_leader_lvl_object_name = read_string(file)
-	rest_lvl_object_name = read_string(file)
-	unknown_1 = read_bool(file)
-	unknown_2 = read_bool(file)
-	unknown_3 = read_int(file)
-	unknown_4 = read_bool(file)
-	is_in_play_plus = read_bool(file)
+def read_lvl_grouping(cursor: Cursor) -> DataObject:
+	lvl_object_name = read_string(cursor)
+	gate_object_name = read_string(cursor)
+	has_checkpoint = read_bool(cursor)
+	checkpoint_leader_lvl_object_name = read_string(cursor)
+	rest_lvl_object_name = read_string(cursor)
+	unknown_1 = read_bool(cursor)
+	unknown_2 = read_bool(cursor)
+	unknown_3 = read_int(cursor)
+	unknown_4 = read_bool(cursor)
+	is_in_play_plus = read_bool(cursor)
 	return {
 		'lvl_name': lvl_object_name,
 		'gate_name': gate_object_name,
@@ -317,33 +364,33 @@ def read_lvl_grouping(file: BufferedReader) -> DataObject:
 		'play_plus': is_in_play_plus,
 	}
 
-def read_lvl_groupings(file: BufferedReader) -> DataList:
-	num_lvl_groupings = read_int(file)
+def read_lvl_groupings(cursor: Cursor) -> DataList:
+	num_lvl_groupings = read_int(cursor)
 	lvl_groupings: DataList = []
 	for _ in range(num_lvl_groupings):
-		lvl_grouping = read_lvl_grouping(file)
+		lvl_grouping = read_lvl_grouping(cursor)
 		lvl_groupings.append(lvl_grouping)
 	return lvl_groupings
 
-def read_master(file: BufferedReader, name: str) -> DataObject:
-	sequin_master_version_number = read_int(file)
-	sequencer_objects_version_number = read_int(file)
-	obj_version_number = read_int(file)
-	components = read_components(file)
-	sequencer_objects = read_sequencer_objects(file)
-	min_end_frame = read_float(file)
-	skybox_object_name = read_string(file)
-	intro_lvl_obj_name = read_string(file)
-	lvl_groupings = read_lvl_groupings(file)
-	unknown_1 = read_bool(file)
-	unknown_2 = read_bool(file)
-	unknown_3 = read_int(file)
-	unknown_4 = read_int(file)
-	unknown_5 = read_int(file)
-	unknown_6 = read_int(file)
-	unknown_7 = read_vector(file)
-	checkpoint_lvl_object_name = read_string(file)
-	unknown_8 = read_string(file)
+def read_master(cursor: Cursor, name: str) -> DataObject:
+	sequin_master_version_number = read_int(cursor)
+	sequencer_objects_version_number = read_int(cursor)
+	obj_version_number = read_int(cursor)
+	components = read_components(cursor)
+	sequencer_objects = read_sequencer_objects(cursor)
+	min_end_frame = read_float(cursor)
+	skybox_object_name = read_string(cursor)
+	intro_lvl_obj_name = read_string(cursor)
+	lvl_groupings = read_lvl_groupings(cursor)
+	unknown_1 = read_bool(cursor)
+	unknown_2 = read_bool(cursor)
+	unknown_3 = read_int(cursor)
+	unknown_4 = read_int(cursor)
+	unknown_5 = read_int(cursor)
+	unknown_6 = read_int(cursor)
+	unknown_7 = read_vector(cursor)
+	checkpoint_lvl_object_name = read_string(cursor)
+	unknown_8 = read_string(cursor)
 	return {
 		'obj_type': 'SequinMaster',
 		'obj_name': name,
@@ -353,77 +400,81 @@ def read_master(file: BufferedReader, name: str) -> DataObject:
 		'checkpoint_lvl_name': checkpoint_lvl_object_name,
 	}
 
-def read_step(file: BufferedReader) -> DataObject:
-	unknown_1 = read_string(file)
+def read_step(cursor: Cursor) -> DataObject:
+	unknown_1 = read_string(cursor)
 	if not unknown_1:
-		num_beats = read_int(file)
-		should_skip_sequin = read_bool(file)
+		num_beats = read_int(cursor)
+		should_skip_sequin = read_bool(cursor)
 		if not should_skip_sequin:
-			sequin = read_string(file)
-		unknown_2 = read_string(file)
-		num_sub_paths = read_int(file)
+			sequin = read_string(cursor)
+		unknown_2 = read_string(cursor)
+		num_sub_paths = read_int(cursor)
 		sub_paths = []
 		for _ in range(num_sub_paths):
-			unknown_3 = read_string(file)
-			unknown_4 = read_string(file)
+			unknown_3 = read_string(cursor)
+			unknown_4 = read_string(cursor)
 			sub_paths.append([unknown_3, unknown_4]) # FIXME: this is probably wrong
-	step_type = read_string(file)
-	offset_between_current_and_prev_step = read_int(file)
-	transform = read_transform(file)
-	unknown_5 = read_bool(file)
-	unknown_6 = read_bool(file)
+	step_type = read_string(cursor)
+	offset_between_current_and_prev_step = read_int(cursor)
+	transform = read_transform(cursor)
+	unknown_5 = read_bool(cursor)
+	unknown_6 = read_bool(cursor)
 	return {
 		'beat_cnt': num_beats,
 		'leaf_name': sequin,
 		'main_path': unknown_2,
 		'sub_paths': sub_paths,
-		**transform,
+		'pos': transform[0:3],
+		'rot_x': transform[3:6],
+		'rot_y': transform[6:9],
+		'rot_z': transform[9:12],
+		'scale': transform[12:15],
 	}
 
-def read_steps(file: BufferedReader) -> DataList:
+def read_steps(cursor: Cursor) -> DataList:
 	steps: DataList = []
-	while read_bool(file):
-		step = read_step(file)
+	while read_bool(cursor):
+		step = read_step(cursor)
 		steps.append(step)
 	return steps
 
-def read_loop(file: BufferedReader) -> DataObject:
-	samp_object_name = read_string(file)
-	num_beats_per_loop = read_int(file)
-	ch_object_name = read_int(file)
+def read_loop(cursor: Cursor) -> DataObject:
+	samp_object_name = read_string(cursor)
+	num_beats_per_loop = read_int(cursor)
+	ch_object_name = read_int(cursor)
 	return {
 		'samp_name': samp_object_name,
 		'beats_per_loop': num_beats_per_loop,
 	}
 
-def read_loops(file: BufferedReader) -> DataList:
-	num_loops = read_int(file)
+def read_loops(cursor: Cursor) -> DataList:
+	num_loops = read_int(cursor)
 	loops: DataList = []
 	for _ in range(num_loops):
-		loop = read_loop(file)
+		loop = read_loop(cursor)
 		loops.append(loop)
 	return loops
 
-def read_lvl(file: BufferedReader, name: str) -> DataObject:
+def read_lvl(cursor: Cursor, name: str) -> DataObject:
 	"""https://rainbowunicorn7297.github.io/#.lvl%20Objects"""
-	sequin_lvl_version_number = read_int(file)
-	sequencer_objects_version_number = read_int(file)
-	obj_version_number = read_int(file)
-	[approach_animation_component, edit_state_component] = read_components(file)
-	sequencer_objects = read_sequencer_objects(file)
-	min_end_frame = read_float(file)
-	move_type = read_string(file)
-	move_sequin = read_string(file)
-	steps = read_steps(file)
-	loops = read_loops(file)
-	unknown_1 = read_bool(file)
-	volume = read_float(file)
-	start_flow = read_string(file)
-	start_flow_trait_path = read_trait_path(file)
-	start_flow_trait_type = read_string(file)
-	is_input_allowed = read_bool(file)
-	tutorial_type = read_string(file)
-	start_angle_fracs = read_vector(file)
+	sequin_lvl_version_number = read_int(cursor)
+	sequencer_objects_version_number = read_int(cursor)
+	obj_version_number = read_int(cursor)
+	[approach_animation_component, edit_state_component] = read_components(cursor)
+	sequencer_objects = read_sequencer_objects(cursor)
+	min_end_frame = read_float(cursor)
+	move_type = read_string(cursor)
+	move_sequin = read_string(cursor)
+	steps = read_steps(cursor)
+	loops = read_loops(cursor)
+	unknown_1 = read_bool(cursor)
+	volume = read_float(cursor)
+	start_flow = read_string(cursor)
+	start_flow_trait_path = read_trait_path(cursor)
+	start_flow_trait_type = read_string(cursor)
+	is_input_allowed = read_bool(cursor)
+	tutorial_type = read_string(cursor)
+	start_angle_fracs = read_vector(cursor)
 	return {
 		'obj_type': 'SequinLevel',
 		'obj_name': name,
@@ -437,54 +488,52 @@ def read_lvl(file: BufferedReader, name: str) -> DataObject:
 		'start_angle_fracs': start_angle_fracs
 	}
 
-def read_boss_pattern(file: BufferedReader) -> DataObject:
-	gate_level_script_node = read_hash(file)
-	boss_pattern_lvl_object_name = read_string(file)
-	unknown_1 = read_bool(file)
-	gate_sentry_type = read_string(file)
-	unknown_2 = read_float(file)
-	bucket_num = read_int(file)
+def read_boss_pattern(cursor: Cursor) -> DataObject:
+	skip(cursor, 4) # gate_level_script_node
+	skip_string(cursor) # boss_pattern_lvl_object_name
+	skip(cursor, 1) # unknown_1
+	skip_string(cursor) # gate_sentry_type
+	skip(cursor, 8) # unknown_2, bucket_num
 	return {}
 
-def read_boss_patterns(file: BufferedReader) -> DataList:
-	num_boss_patterns = read_int(file)
+def read_boss_patterns(cursor: Cursor) -> DataList:
+	num_boss_patterns = read_int(cursor)
 	boss_patterns: DataList = []
 	for _ in range(num_boss_patterns):
-		boss_pattern = read_boss_pattern(file)
+		boss_pattern = read_boss_pattern(cursor)
 		boss_patterns.append(boss_pattern)
 	return boss_patterns
 
-def read_gate(file: BufferedReader, name: str) -> DataObject:
+def read_gate(cursor: Cursor, name: str) -> DataObject:
 	"""https://rainbowunicorn7297.github.io/#.gate%20Objects"""
-	sequin_gate_version_number = read_int(file)
-	obj_version_number = read_int(file)
-	components = read_components(file)
-	spn_obj_name = read_string(file)
-	ent_trait_path = read_trait_path(file)
-	boss_patterns = read_boss_patterns(file)
-	pre_boss_lvl_object_name = read_string(file)
-	post_boss_lvl_object_name = read_string(file)
-	restart_lvl_obj_name = read_string(file)
-	unknown_1 = read_string(file)
-	component_type = read_string(file)
-	unknown_2 = read_float(file)
-	level_random_type = read_string(file)
+	skip(cursor, 8) # sequin_gate_version_number, obj_version_number
+	components = read_components(cursor)
+	skip_string(cursor) # spn_obj_name
+	skip_trait_path(cursor) # ent_trait_path
+	boss_patterns = read_boss_patterns(cursor)
+	skip_string(cursor) # pre_boss_lvl_object_name
+	skip_string(cursor) # post_boss_lvl_object_name
+	skip_string(cursor) # restart_lvl_obj_name
+	skip_string(cursor) # unknown_1
+	skip_string(cursor) # component_type
+	skip(cursor, 4) # unknown_2
+	skip_string(cursor) # level_random_type
 	return {} # TODO: this has no matching file
 
-def read_samp(file: BufferedReader, name: str) -> DataObject:
+def read_samp(cursor: Cursor, name: str) -> DataObject:
 	"""https://rainbowunicorn7297.github.io/#.samp%20Objects"""
-	sample_version_number = read_int(file)
-	obj_version_number = read_int(file)
-	components = read_components(file)
-	sample_play_mode = read_string(file)
-	file_path = read_file_path(file)
-	should_stream = read_bool(file)
-	loop_count = read_int(file)
-	volume = read_float(file)
-	pitch = read_float(file)
-	pan = read_float(file)
-	offset = read_float(file)
-	channel_group = read_string(file)
+	sample_version_number = read_int(cursor)
+	obj_version_number = read_int(cursor)
+	components = read_components(cursor)
+	sample_play_mode = read_string(cursor)
+	file_path = read_file_path(cursor)
+	should_stream = read_bool(cursor)
+	loop_count = read_int(cursor)
+	volume = read_float(cursor)
+	pitch = read_float(cursor)
+	pan = read_float(cursor)
+	offset = read_float(cursor)
+	channel_group = read_string(cursor)
 	return {
 		'items': [
 			{
@@ -501,13 +550,13 @@ def read_samp(file: BufferedReader, name: str) -> DataObject:
 		]
 	}
 
-def read_spn(file: BufferedReader, name: str) -> DataObject:
+def read_spn(cursor: Cursor, name: str) -> DataObject:
 	"""https://rainbowunicorn7297.github.io/#.spn%20Objects"""
-	entity_spawner_version_number = read_int(file)
-	obj_version_number = read_int(file)
-	[edit_state_component, transform_component] = read_components(file)
-	entity_objlib_file_path = read_file_path(file)
-	render_bucket = read_string(file)
+	entity_spawner_version_number = read_int(cursor)
+	obj_version_number = read_int(cursor)
+	[edit_state_component, transform_component] = read_components(cursor)
+	entity_objlib_file_path = read_file_path(cursor)
+	render_bucket = read_string(cursor)
 	return {
 		'items': [
 			{
@@ -520,179 +569,182 @@ def read_spn(file: BufferedReader, name: str) -> DataObject:
 		]
 	}
 
-def read_tex(file: BufferedReader, name: str) -> DataObject:
+def read_tex(cursor: Cursor, name: str) -> DataObject:
 	"""https://rainbowunicorn7297.github.io/#.tex%20Objects"""
-	tex_2d_version_number = read_int(file)
-	obj_version_number = read_int(file)
-	components = read_components(file)
-	compression = read_string(file)
-	has_mips = read_bool(file)
-	file_path = read_file_path(file)
+	skip(cursor, 8) # tex_2d_version_number, obj_version_number
+	components = read_components(cursor)
+	skip_string(cursor) # compression
+	skip(cursor, 1) # has_mips
+	skip_file_path(cursor) # file_path
 	return {} # TODO: this has no matching file
 
-def read_mat(file: BufferedReader, name: str) -> DataObject:
+def read_mat(cursor: Cursor, name: str) -> DataObject:
 	"""https://rainbowunicorn7297.github.io/#.mat%20Objects"""
-	mat_version_number = read_int(file)
-	obj_version_number = read_int(file)
-	components = read_components(file)
-	decal_map = read_string(file)
-	emissive_map = read_string(file)
-	reflection_map = read_string(file)
-	blending = read_string(file)
-	material_lighting = read_int(file)
-	cull_mode = read_string(file)
-	z_mode = read_string(file)
-	unknown_1 = read_bool(file)
-	unknown_2 = read_bool(file)
-	material_filtering = read_string(file)
-	emissive_color = read_color(file)
-	ambient_color = read_color(file)
-	diffuse_color = read_color(file)
-	specular_color = read_color(file)
-	reflectivity_color = read_color(file)
-	alpha = read_float(file)
-	unknown_3 = read_float(file)
-	specular_map = read_string(file)
-	texture_transform_mode = read_string(file)
-	texture_transform = read_transform(file)
-	unknown_4 = read_float(file)
-	should_disable_noise_vignette_when_low_spec_rendering_used = read_bool(file)
-	noise_vignette_object_name = read_string(file)
-	unknown_5 = read_bool(file)
+	skip(cursor, 8) # mat_version_number, obj_version_number
+	components = read_components(cursor)
+	skip_string(cursor) # decal_map
+	skip_string(cursor) # emissive_map
+	skip_string(cursor) # reflection_map
+	skip_string(cursor) # blending
+	skip(cursor, 4) # material_lighting
+	skip_string(cursor) # cull_mode
+	skip_string(cursor) # z_mode
+	skip(cursor, 2) # unknown_1, unknown_2
+	skip_string(cursor) # material_filtering
+	skip(cursor, 88) # emissive_color, ambient_color, diffuse_color, specular_color, reflectivity_color, alpha, unknown_3
+	skip_string(cursor) # specular_map
+	skip_string(cursor) # texture_transform_mode
+	skip(cursor, 65) # texture_transform, unknown_4, should_disable_noise_vignette_when_low_spec_rendering_used
+	skip_string(cursor) # noise_vignette_object_name
+	skip(cursor, 1) # unknown_5
 	return {} # TODO: this has no matching file
 
-def read_mesh(file: BufferedReader, name: str) -> DataObject:
+def read_mesh(cursor: Cursor, name: str) -> DataObject:
 	"""https://rainbowunicorn7297.github.io/#.mesh%20Objects"""
-	mesh_version_number = read_int(file)
-	obj_version_number = read_int(file)
-	components = read_components(file)
-	mat_object_name = read_string(file)
-	is_mesh_data_defined_in_object = read_string(file)
+	skip(cursor, 8) # mesh_version_number, obj_version_number
+	components = read_components(cursor)
+	skip_string(cursor) # mat_object_name
+	is_mesh_data_defined_in_object = read_string(cursor)
 	if is_mesh_data_defined_in_object:
-		num_vertices = read_int(file)
-		for _ in range(num_vertices):
-			vertex_position = read_vector(file)
-			vertex_normal = read_vector(file)
-			vertex_uvw = read_vector(file)
-		num_faces = read_int(file)
-		for _ in range(num_faces):
-			vertex_index_1 = read_short(file)
-			vertex_index_2 = read_short(file)
-			vertex_index_3 = read_short(file)
-		unknown_1 = read_bool(file)
-		unknown_2 = read_bool(file)
+		num_vertices = read_int(cursor)
+		skip(cursor, 36 * num_vertices) # vertex_position, vertex_normal, vertex_uvw for each vertex
+		num_faces = read_int(cursor)
+		skip(cursor, 6 * num_faces) # vertex_index_1, vertex_index_2, vertex_index_3 for each face
+		skip(cursor, 2) # unknown_1, unknown_2
 	else:
-		file_path = read_file_path(file)
-		cache_name_param_1 = read_int(file)
-		cache_name_param_2 = read_int(file)
-		cache_name_param_3 = read_int(file)
-		cache_name_param_4 = read_bool(file)
-		cache_name_param_5 = read_int(file)
+		skip_file_path(cursor) # file_path
+		skip(cursor, 17) # cache_name_param_1, cache_name_param_2, cache_name_param_3, cache_name_param_4, cache_name_param_5
 	return {} # TODO: this has no matching file
 
-def read_path(file: BufferedReader, name: str) -> DataObject:
-	path_version_number = read_int(file)
-	obj_version_number = read_int(file)
-	components = read_components(file)
-	tile_scale = read_vector(file)
-	tile_size = read_vector(file)
-	lane_spacing = read_float(file)
-	mesh_object_name = read_string(file)
-	does_bend = read_bool(file)
-	bend_scale_interpolation_method = read_string(file)
-	does_pulse_color = read_bool(file)
-	does_pulse_scale = read_bool(file)
-	v_scale = read_float(file)
-	num_path_decorators = read_int(file)
+def read_path(cursor: Cursor, name: str) -> DataObject:
+	skip(cursor, 8) # path_version_number, obj_version_number
+	components = read_components(cursor)
+	skip(cursor, 28) # tile_scale, tile_size, lane_spacing
+	skip_string(cursor) # mesh_object_name
+	skip(cursor, 1) # does_bend
+	skip_string(cursor) # bend_scale_interpolation_method
+	skip(cursor, 6) # does_pulse_color, does_pulse_scale, v_scale
+	num_path_decorators = read_int(cursor)
 	for _ in range(num_path_decorators):
-		path_decorator_name = read_string(file)
-	is_visible = read_bool(file)
+		skip_string(cursor) # path_decorator_name
+	skip(cursor, 1) # is_visible
 	return {} # TODO: this has no matching file
 
-level_object_readers: dict[str, Callable[[BufferedReader, str], Any]] = {
-	'ce7e85f6': read_leaf,
-	'490780b9': read_master,
-	'd3058b5d': read_drawer,
-	'7aa8f390': read_samp,
-	'bcd17473': read_lvl,
-	'd897d5db': read_spn,
-	'7d9db5ef': read_xfm,
-	'5232f8f9': read_anim,
-	'bf69f115': read_mesh,
-	'4890a3f6': read_path,
-	'7ba5c8e0': read_mat,
-	'86621b1e': read_flow,
-	'aa63a508': read_gate,
-	'3bbcc4ec': read_env,
-	'96ba8a70': read_tex,
+level_object_readers: dict[int, Callable[[Cursor, str], Any]] = {
+	0xce7e85f6: read_leaf,
+	0x490780b9: read_master,
+	0xd3058b5d: read_drawer,
+	0x7aa8f390: read_samp,
+	0xbcd17473: read_lvl,
+	0xd897d5db: read_spn,
+	0x7d9db5ef: read_xfm,
+	0x5232f8f9: read_anim,
+	0xbf69f115: read_mesh,
+	0x4890a3f6: read_path,
+	0x7ba5c8e0: read_mat,
+	0x86621b1e: read_flow,
+	0xaa63a508: read_gate,
+	0x3bbcc4ec: read_env,
+	0x96ba8a70: read_tex,
 }
-def read_level_object_declaration(file: BufferedReader) -> tuple[str, Callable[[BufferedReader, str], Any]]:
-	object_name = read_string(file)
-	object_type = read_hash(file)
+def read_level_object_declaration(cursor: Cursor) -> tuple[str, Callable[[Cursor, str], Any]]:
+	object_name = read_string(cursor)
+	object_type = read_hash_value(cursor)
 	object_reader = level_object_readers[object_type]
 	return (object_name, object_reader)
 
-def read_level_object_declarations(file: BufferedReader) -> list[tuple[str, Callable[[BufferedReader, str], Any]]]:
-	num_objects = read_int(file)
-	object_declarations: list[tuple[str, Callable[[BufferedReader, str], Any]]] = []
+def read_level_object_declarations(cursor: Cursor) -> list[tuple[str, Callable[[Cursor, str], Any]]]:
+	num_objects = read_int(cursor)
+	object_declarations: list[tuple[str, Callable[[Cursor, str], Any]]] = []
 	for _ in range(num_objects):
-		object_declaration = read_level_object_declaration(file)
+		object_declaration = read_level_object_declaration(cursor)
 		object_declarations.append(object_declaration)
 	return object_declarations
 
-def read_level_objlib(file: BufferedReader):
-	unknown_1 = read_int(file)
-	unknown_2 = read_int(file)
-	unknown_3 = read_int(file)
-	unknown_4 = read_int(file)
-	global_libraries = read_global_libraries(file)
-	original_file_path = read_string(file)
-	external_objects = read_level_external_objects(file)
-	object_declarations = read_level_object_declarations(file)
+def read_level_objlib(cursor: Cursor):
+	unknown_1 = read_int(cursor)
+	unknown_2 = read_int(cursor)
+	unknown_3 = read_int(cursor)
+	unknown_4 = read_int(cursor)
+	global_libraries = read_global_libraries(cursor)
+	original_file_path = read_string(cursor)
+	external_objects = read_level_external_objects(cursor)
+	object_declarations = read_level_object_declarations(cursor)
 	for object_declaration in object_declarations:
-		object = object_declaration[1](file, object_declaration[0])
+		object = object_declaration[1](cursor, object_declaration[0])
 
 objlib_readers = {
-	'0b374d9e': read_level_objlib
+	0x0b374d9e: read_level_objlib
 }
-def read_objlib_file(file: BufferedReader):
-	objlib_type = read_hash(file)
+def read_objlib_file(cursor: Cursor):
+	objlib_type = read_hash_value(cursor)
 	objlib_reader = objlib_readers[objlib_type]
-	return objlib_reader(file)
+	return objlib_reader(cursor)
 
 file_readers = {
 	8: read_objlib_file
 }
-def read_file(file: BufferedReader):
-	file_type = read_int(file)
+def read_file(cursor: Cursor):
+	file_type = read_int(cursor)
 	file_reader = file_readers[file_type]
-	return file_reader(file)
+	return file_reader(cursor)
+
+line_indents = ['\n' + indent * '\t' for indent in range(64)]
+def get_line_indent(indent: int) -> str:
+	return line_indents[indent] if indent < len(line_indents) else '\n' + indent * '\t'
+
+def write_fake_json(data: Any, write: Callable[[str], Any], indent: int = 0):
+	stack: list[tuple[Any, int | None]] = [(data, indent)] # Entries with no indent are literal text
+	while stack:
+		node, node_indent = stack.pop()
+		if node_indent is None:
+			write(node)
+			continue
+		node_type = type(node)
+		if node_type is dict:
+			inner_line_indent = get_line_indent(node_indent + 1)
+			write('{')
+			stack.append((get_line_indent(node_indent) + '}', None))
+			for key, value in reversed(node.items()):
+				stack.append((',', None))
+				stack.append((value, node_indent + 1))
+				stack.append((': ', None))
+				stack.append((key, node_indent + 1))
+				stack.append((inner_line_indent, None))
+		elif node_type is list:
+			inner_line_indent = get_line_indent(node_indent + 1)
+			write('[')
+			stack.append((get_line_indent(node_indent) + ']', None))
+			for item in reversed(node):
+				stack.append((',', None))
+				stack.append((item, node_indent + 1))
+				stack.append((inner_line_indent, None))
+		elif node_type is DataPoints:
+			stack.append((dict(zip(node.times, node.values)), node_indent))
+		elif node_type is int or node_type is bool:
+			write(str(node))
+		elif node_type is float:
+			write(str(int(node)) if node.is_integer() else str(node))
+		elif node_type is str:
+			write('\'' + node + '\'')
+		else:
+			raise TypeError('Unknown type to format ' + str(node_type))
 
 def format_fake_json(data: Any, indent: int = 0) -> str:
-	indents = indent * '\t'
-	inner_indents = (indent + 1) * '\t'
-	if isinstance(data, dict):
-		return '{' + ''.join('\n' + inner_indents + format_fake_json(key, indent + 1) + ': ' + format_fake_json(value, indent + 1) + ',' for key, value in data.items()) + '\n' + indents + '}'
-	elif isinstance(data, list):
-		return '[' + ''.join('\n' + inner_indents + format_fake_json(item, indent + 1) + ',' for item in data) + '\n' + indents + ']'
-	elif isinstance(data, int):
-		return str(data)
-	elif isinstance(data, float):
-		return str(int(data)) if data.is_integer() else str(data)
-	elif isinstance(data, str):
-		return '\'' + data + '\''
-	else:
-		raise TypeError('Unknown type to format ' + str(type(data)))
+	parts: list[str] = []
+	write_fake_json(data, parts.append, indent)
+	return ''.join(parts)
 
 def main():
 	leaf_path = sys.argv[1] #'sample_leaf.txt'
 	leaf_name = leaf_path[:leaf_path.rindex('.')]
 	with open(leaf_path, 'rb') as leaf_file:
-		leaf = read_leaf(leaf_file, leaf_path)
+		leaf_data = leaf_file.read()
+	leaf = read_leaf(Cursor(memoryview(leaf_data)), leaf_path)
 	
 	leaf_save_path = f'leaf_{leaf_name}.txt'
-	with open(leaf_save_path, 'w+') as leaf_file:
-		leaf_file.write(format_fake_json(leaf))
+	with open(leaf_save_path, 'w+', buffering=1 << 20) as leaf_file:
+		write_fake_json(leaf, leaf_file.write)
 
 if __name__ == '__main__':
 	main()
\ No newline at end of file
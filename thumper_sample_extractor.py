@@ -1,26 +1,40 @@
 """Documentation: https://rainbowunicorn7297.github.io/"""
 
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from io import BufferedReader, BytesIO
-from os import listdir, makedirs
+from mmap import mmap, ACCESS_READ
+from os import fstat, makedirs, scandir
 from fsb5 import FSB5
 from typing import Callable, Set, Tuple
-from os.path import join, dirname, exists
-from numpy import uint32
+from os.path import join, dirname
 from PIL import Image, UnidentifiedImageError
+from shutil import copyfileobj
+import os
+import sys
+import re
 
+hash32_seed = ((0x811c9dc5 ^ ord('A')) * 0x1000193) & 0xffffffff
+"""State after the 'A' that every hashed string is prefixed with"""
+
+@lru_cache(maxsize=None)
 def hash32(f: str) -> str:
 	"""A magic number is a 32-bit hash value produced by applying a hash function on a string or a byte array.
 	Hash tables are maintained in the game executable mapping hash values to objects or string literals like game file paths,
 	object types and parameter names. This is probably done to avoid expensive string operations such as comparisons and creating new copies,
 	and to allow fast lookup of objects using the hash value as the ID."""
-	f = 'A' + f
-	h = uint32(0x811c9dc5)
-	for c in f:
-		h = uint32(uint32(h ^ ord(c)) * 0x1000193)
-	h = uint32(h * 0x2001)
-	h = uint32(uint32(h ^ uint32(h >> 0x7)) * 0x9)
-	h = uint32(uint32(h ^ uint32(h >> 0x11)) * 0x21)
-	return hex(h)[2:]
+	try:
+		codes = f.encode('latin-1') # Game paths are ASCII, and latin-1 maps each character to the byte of the same value
+	except UnicodeEncodeError:
+		codes = map(ord, f) # Anything past U+00FF is hashed by code point like everything else
+	h = hash32_seed
+	for c in codes:
+		h = ((h ^ c) * 0x1000193) & 0xffffffff
+	h = (h * 0x2001) & 0xffffffff
+	h = ((h ^ (h >> 0x7)) * 0x9) & 0xffffffff
+	h = ((h ^ (h >> 0x11)) * 0x21) & 0xffffffff
+	return format(h, 'x')
 
 magic_header_descriptors: dict[bytes, str] = {
 	bytes.fromhex('4314a51b'): 'GFX',
@@ -32,36 +46,92 @@ magic_header_descriptors: dict[bytes, str] = {
 	b'DDS ': 'Texture',
 }
 
-def list_file_headers(file_name: str, pc: BufferedReader):
-	pc.seek(0)
-	pc_type = int.from_bytes(pc.read(4), 'little')
-	pc_magic_header = pc.read(4)
-	print(file_name, pc_type, magic_header_descriptors[pc_magic_header] if pc_magic_header in magic_header_descriptors else pc_magic_header)
+FileHeader = Tuple[int, bytes]
+"""File type and magic header at the start of every cache file"""
 
-def find_file_references(file_name: str, pc: BufferedReader, start_query: str, end_query: str):
-	"""Takes a file and finds all references to other filepaths that start with `query` and end in `ext_query`"""
-	start_query_bytes = start_query.encode()
-	end_query_bytes = end_query.encode()
+def list_cache_files() -> list[str]:
+	"""Names of the cache files in the working directory"""
+	with scandir() as entries:
+		return [entry.name for entry in entries if entry.name.endswith('.pc') and entry.is_file()]
 
+def read_file_header(pc: BufferedReader) -> FileHeader:
 	pc.seek(0)
 	pc_type = int.from_bytes(pc.read(4), 'little')
 	pc_magic_header = pc.read(4)
+	return (pc_type, pc_magic_header)
 
-	pc.seek(0)
-	data = pc.read()
-	barr = bytearray(data)
-	path_index = barr.find(start_query_bytes)
-	while path_index >= 0:
-		ext_index = barr.index(end_query_bytes, path_index) + len(end_query_bytes)
-		target_path_bytes = data[path_index:ext_index]
-		try:
-			target_path = target_path_bytes.decode()
-			print(file_name, pc_type, pc_magic_header, magic_header_descriptors[pc_magic_header] if pc_magic_header in magic_header_descriptors else pc_magic_header, hex(path_index), target_path)
-			yield target_path
-		except UnicodeDecodeError:
-			print(f'Could not decode {target_path_bytes}')
-		finally:
-			path_index = barr.find(start_query_bytes, ext_index)
+def read_cache_header(cache_path: str) -> FileHeader:
+	"""Reads the header of a cache file with plain file descriptor calls, for checking files before opening them properly"""
+	fd = os.open(cache_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0)) # O_BINARY only exists, and is needed, on Windows
+	try:
+		header = os.read(fd, 8)
+	finally:
+		os.close(fd)
+	return (int.from_bytes(header[:4], 'little'), header[4:8])
+
+def file_header_matches(pc_header: FileHeader, file_type: int, magic_header: bytes | None = None) -> bool:
+	pc_file_type, pc_magic_header = pc_header
+	return pc_file_type == file_type and (pc_magic_header == magic_header if magic_header else True)
+
+def list_file_headers(file_name: str, pc: BufferedReader):
+	pc_type, pc_magic_header = read_file_header(pc)
+	print(file_name, pc_type, magic_header_descriptors.get(pc_magic_header, pc_magic_header))
+
+ReferenceScan = Tuple[re.Pattern[bytes], list[Tuple[bytes, bytes]]]
+"""Pattern finding where any query's start could begin, and each query's encoded start and end"""
+
+def compile_reference_queries(queries: list[Tuple[str, str]]) -> ReferenceScan:
+	encoded_queries = [(start_query.encode(), end_query.encode()) for start_query, end_query in queries]
+	start_markers = dict.fromkeys(start_query for start_query, _ in encoded_queries) # Queries can share a start
+	start_pattern = re.compile(b'(?=' + b'|'.join(re.escape(start_marker) for start_marker in start_markers) + b')') # Zero-width, so starts overlapping each other are all found
+	return (start_pattern, encoded_queries)
+
+def find_file_references(file_name: str, pc: BufferedReader, reference_scan: ReferenceScan, pc_header: FileHeader | None = None):
+	"""Takes a file and finds all references to other filepaths that start with a query's `start_query` and end in its `end_query`.
+	Yields the index of the matching query along with each path, so that several queries can share one pass over the file.
+	Each query finds the same paths it would alone, since it only resumes after the end of its own last path.
+	`pc_header` can be passed when the caller already knows it, to avoid reading it again"""
+	start_pattern, queries = reference_scan
+
+	if pc_header is None:
+		pc_header = read_file_header(pc)
+	pc_type, pc_magic_header = pc_header
+	line_prefix = f'{file_name} {pc_type} {pc_magic_header} {magic_header_descriptors.get(pc_magic_header, pc_magic_header)}' # The same for every reference in the file
+
+	if fstat(pc.fileno()).st_size == 0: # Empty files can't be mapped
+		return
+	lines: list[str] = [] # Written out together once the file is done rather than printed per reference
+	with mmap(pc.fileno(), 0, access=ACCESS_READ) as data:
+		resume_offsets = [0] * len(queries) # Where each query's next path may start, or -1 once it has no end left to find
+		for start in start_pattern.finditer(data):
+			start_offset = start.start()
+			for query_index, (start_query, end_query) in enumerate(queries):
+				if start_offset < resume_offsets[query_index] or resume_offsets[query_index] < 0 or data[start_offset:start_offset + len(start_query)] != start_query:
+					continue
+				end_offset = data.find(end_query, start_offset + len(start_query))
+				if end_offset < 0:
+					resume_offsets[query_index] = -1
+					continue
+				end_offset += len(end_query)
+				resume_offsets[query_index] = end_offset
+				target_path_bytes = data[start_offset:end_offset]
+				try:
+					target_path = target_path_bytes.decode()
+					lines.append(f'{line_prefix} {hex(start_offset)} {target_path}\n')
+					yield (query_index, target_path)
+				except UnicodeDecodeError:
+					lines.append(f'Could not decode {target_path_bytes}\n')
+			if all(resume_offset < 0 for resume_offset in resume_offsets):
+				break
+	sys.stdout.write(''.join(lines))
+
+ensured_dirs: Set[str] = set()
+"""Directories this process has already created, so each is only made once"""
+
+def ensure_dir(path: str):
+	if path and path not in ensured_dirs: # An empty path is the working directory
+		makedirs(path, exist_ok=True)
+		ensured_dirs.add(path)
 
 Extractor = Callable[[BufferedReader, str, str | None], None]
 
@@ -69,9 +139,9 @@ def extract_mesh(pc: BufferedReader, cache_path: str, save_path: str | None):
 	if save_path is None:
 		save_path = join('extracted', 'meshes', f'{cache_path}.x')
 	print(save_path)
-	makedirs(dirname(save_path), exist_ok=True)
+	ensure_dir(dirname(save_path))
 	with open(save_path, 'wb') as file:
-		file.write(pc.read())
+		copyfileobj(pc, file)
 
 def extract_audio(pc: BufferedReader, cache_path: str, save_path: str | None):
 	fsb = FSB5(pc.read())
@@ -79,16 +149,22 @@ def extract_audio(pc: BufferedReader, cache_path: str, save_path: str | None):
 	
 	ext = fsb.get_sample_extension()
 
-	for sample in fsb.samples:
-		if save_path is None:
-			save_path = join('extracted', 'samples', f'{sample.name}.{ext}')
+	if save_path is None:
+		save_dir = join('extracted', 'samples')
+		sample_paths = [join(save_dir, f'{cache_path}_{sample.name}.{ext}') for sample in fsb.samples] # Banks extracted in parallel can share sample names
+	else:
+		save_dir = dirname(save_path)
+		save_path_base = save_path[:save_path.rindex('.')] # it's ogg not wav
+		if len(fsb.samples) == 1:
+			sample_paths = [f'{save_path_base}.{ext}']
 		else:
-			save_path = save_path[:save_path.rindex('.')] + '.' + ext # it's ogg not wav
-		#print(cache_path, save_path)
+			sample_paths = [f'{save_path_base}_{sample.name}.{ext}' for sample in fsb.samples]
+	#print(cache_path, sample_paths)
 
-		makedirs(dirname(save_path), exist_ok=True)
+	ensure_dir(save_dir)
 
-		with open(save_path, 'wb') as sample_file:
+	for sample, sample_path in zip(fsb.samples, sample_paths):
+		with open(sample_path, 'wb') as sample_file:
 			rebuilt_sample = fsb.rebuild_sample(sample)
 			sample_file.write(rebuilt_sample)
 
@@ -96,10 +172,10 @@ def extract_texture(pc: BufferedReader, cache_path: str, save_path: str | None):
 	if save_path is None:
 		save_path = join('extracted', 'textures', f'{cache_path}.png')
 	print(save_path)
-	makedirs(dirname(save_path), exist_ok=True)
+	ensure_dir(dirname(save_path))
 	try:
 		texture = Image.open(BytesIO(pc.read()))
-		texture.save(save_path)
+		texture.save(save_path, compress_level=1) # Fastest zlib level, encoding at the default level takes longer than decoding the DDS
 	except UnidentifiedImageError:
 		print(f'Could not load texture file {cache_path}')
 
@@ -127,70 +203,103 @@ file_type_extractors: dict[int, dict[bytes, Extractor | None] | Extractor | None
 }
 """https://rainbowunicorn7297.github.io/#Overall%20Structure%20of%20Game%20Files"""
 
-def extract_file(cache_path: str, pc: BufferedReader, file_type: int, magic_header: bytes | None = None, save_path: str | None = None):
-	pc.seek(0)
-	pc_file_type = int.from_bytes(pc.read(4), 'little')
-	pc_magic_header = pc.read(4)
-	if pc_file_type == file_type and (pc_magic_header == magic_header if magic_header else True):
-		pc.seek(4) # Actual data starts here (includes magic header)
+def flatten_extractors() -> dict[Tuple[int, bytes | None], Extractor]:
+	"""Keys every extractor in `file_type_extractors` by file type and magic header, or by file type and None if it handles every magic header"""
+	extractors: dict[Tuple[int, bytes | None], Extractor] = {}
+	for file_type, extractor_group in file_type_extractors.items():
+		if isinstance(extractor_group, dict):
+			for magic_header, extractor in extractor_group.items():
+				if extractor is not None:
+					extractors[(file_type, magic_header)] = extractor
+		elif extractor_group is not None:
+			extractors[(file_type, None)] = extractor_group
+	return extractors
+
+extractors = flatten_extractors()
 
-		if file_type not in file_type_extractors:
-			print(f'File type {file_type} not understood')
+def extract_file(cache_path: str, pc: BufferedReader, file_type: int, magic_header: bytes | None = None, save_path: str | None = None, pc_header: FileHeader | None = None):
+	"""`pc_header` can be passed when the caller already knows it, to avoid reading it again"""
+	if pc_header is None:
+		pc_header = read_file_header(pc)
+	if file_header_matches(pc_header, file_type, magic_header):
+		extractor = extractors.get((file_type, magic_header)) or extractors.get((file_type, None))
+		if extractor is None:
+			print(f'No extractor for file type {file_type} with magic header {magic_header}')
 		else:
-			extractor_group = file_type_extractors[file_type]
-			if extractor_group is None:
-				print(f'No extractor created for file type {file_type}')
-			elif isinstance(extractor_group, dict):
-				if magic_header is None:
-					print(f'No magic header supplied for file type {file_type} where one is needed')
-				elif magic_header not in extractor_group:
-					print(f'File type {file_type} with magic header {magic_header} not understood')
-				else:
-					extractor = extractor_group[magic_header]
-					if extractor is None:
-						print(f'No extractor created for file type {file_type} and magic header {magic_header}')
-					else:
-						extractor(pc, cache_path, save_path)
-			else:
-				extractor = extractor_group
-				extractor(pc, cache_path, save_path)
+			pc.seek(4) # Actual data starts here (includes magic header)
+			extractor(pc, cache_path, save_path)
+
+def extract_cache(cache_path: str, file_type: int, magic_header: bytes | None = None, save_path: str | None = None, pc_header: FileHeader | None = None):
+	with open(cache_path, 'rb') as pc:
+		extract_file(cache_path, pc, file_type, magic_header, save_path, pc_header)
+
+def scan_cache(file_name: str, reference_scan: ReferenceScan) -> Tuple[FileHeader, list[Tuple[int, str]]]:
+	with open(file_name, 'rb') as pc:
+		pc_header = read_file_header(pc)
+		return (pc_header, list(find_file_references(file_name, pc, reference_scan, pc_header)))
+
+ReferenceQuery = Tuple[str, str, str, int, bytes | None]
+"""Description, start query, end query, file type and magic header of one kind of reference to extract"""
 
 def find_all_references_and_extract(description: str, start_query: str, end_query: str, file_type: int, magic_header: bytes | None = None):
-	target_paths: Set[str] = set()
+	find_all_references_and_extract_multi([(description, start_query, end_query, file_type, magic_header)])
 
-	files = [f for f in listdir() if f[-3:] == '.pc']
-	for f in files:
-		with open(f, 'rb') as pc:
-			target_paths.update(find_file_references(f, pc, start_query, end_query))
+def find_all_references_and_extract_multi(queries: list[ReferenceQuery]):
+	"""Scans every cache file once for all of the queries, then extracts what each query found"""
+	target_path_sets: list[Set[str]] = [set() for _ in queries]
+	reference_scan = compile_reference_queries([(start_query, end_query) for _, start_query, end_query, _, _ in queries])
+	file_headers: dict[str, FileHeader] = {}
+
+	files = list_cache_files()
+	with ProcessPoolExecutor() as executor:
+		for f, (pc_header, references) in zip(files, executor.map(scan_cache, files, repeat(reference_scan), chunksize=8)):
+			file_headers[f] = pc_header
+			for query_index, target_path in references:
+				target_path_sets[query_index].add(target_path)
 
+	for (description, _, _, file_type, magic_header), target_paths in zip(queries, target_path_sets):
+		extract_references(description, target_paths, file_type, magic_header, file_headers)
+
+def extract_references(description: str, target_paths: Set[str], file_type: int, magic_header: bytes | None, file_headers: dict[str, FileHeader]):
+	"""`file_headers` maps the name of every cache file present to its header, as collected while scanning"""
 	with open(f'{description} list.txt', 'w') as list_txt:
-		list_txt.write('\n'.join(sorted(list(target_paths), key=str.casefold)))
+		list_txt.write('\n'.join(sorted(target_paths, key=str.casefold)))
 	
 	missing_caches: Set[Tuple[str, str]] = set()
+	extractions: list[Tuple[str, str, FileHeader]] = []
 	for target_path in target_paths:
 		pc_path = hash32(target_path) + '.pc'
 
-		if exists(pc_path):
+		pc_header = file_headers.get(pc_path)
+		if pc_header is not None:
 			print(pc_path, target_path)
-			with open(pc_path, 'rb') as pc:
-				extract_file(pc_path, pc, file_type, magic_header, target_path)
+			if file_header_matches(pc_header, file_type, magic_header):
+				extractions.append((pc_path, target_path, pc_header))
 		
 		else:
 			print(pc_path, target_path, 'not found!')
 			missing_caches.add((pc_path, target_path))
 	
+	with ProcessPoolExecutor() as executor:
+		pc_paths = [pc_path for pc_path, _, _ in extractions]
+		save_paths = [target_path for _, target_path, _ in extractions]
+		pc_headers = [pc_header for _, _, pc_header in extractions]
+		for _ in executor.map(extract_cache, pc_paths, repeat(file_type), repeat(magic_header), save_paths, pc_headers, chunksize=8):
+			pass # Raise any exception from the workers
+	
 	if missing_caches:
 		with open(f'missing {description} caches.txt', 'w') as bad_cache_txt:
-			bad_cache_txt.write('These cache files were not found!\n' + '\n'.join([f'{x[0]} {x[1]}' for x in sorted(list(missing_caches), key=lambda x: str.casefold(x[1]))]))
+			bad_cache_txt.write('These cache files were not found!\n' + '\n'.join([f'{x[0]} {x[1]}' for x in sorted(missing_caches, key=lambda x: x[1].casefold())]))
 
 def attempt_extract_all(file_type: int, magic_header: bytes | None = None):
-	files = [f for f in listdir() if f[-3:] == '.pc']
-	for f in files:
-		with open(f, 'rb') as pc:
-			extract_file(f, pc, file_type, magic_header)
+	file_headers = {f: read_cache_header(f) for f in list_cache_files()}
+	files = [f for f, pc_header in file_headers.items() if file_header_matches(pc_header, file_type, magic_header)]
+	with ProcessPoolExecutor() as executor:
+		for _ in executor.map(extract_cache, files, repeat(file_type), repeat(magic_header), repeat(None), [file_headers[f] for f in files], chunksize=8):
+			pass # Raise any exception from the workers
 
 def list_all_file_headers():
-	files = [f for f in listdir() if f[-3:] == '.pc']
+	files = list_cache_files()
 	for f in files:
 		with open(f, 'rb') as pc:
 			list_file_headers(f, pc)
@@ -199,6 +308,7 @@ def main():
 	list_all_file_headers()
 	#find_all_references_and_extract('audio sample', 'samples/', '.wav', 13, b'FSB5')
 	#find_all_references_and_extract('texture', 'fx/textures/', '.png', 13, b'DDS ')
+	#find_all_references_and_extract_multi([('audio sample', 'samples/', '.wav', 13, b'FSB5'), ('texture', 'fx/textures/', '.png', 13, b'DDS ')])
 	#attempt_extract_all(13, b'DDS ')
 	#attempt_extract_all(6, 'xof ') #bytes.fromhex('01000000'))
 